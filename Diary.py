@@ -1,8 +1,114 @@
-from datetime import datetime
+from datetime import date, datetime
+import functools
+import hashlib
+import io
+import operator
 import os
+import platform
+import subprocess
 import sys
 import re
 
+_DIARY_DATE_RE = re.compile(r'\\begin{diary}{[^}]+}{(\d{2}/\d{2}/\d{2})}')
+_TITLE_RE = re.compile(r'\\title{\\Huge ([^}]+)}')
+_AUTHOR_RE = re.compile(r'\\author{([^}]+)}')
+_AUX_INPUT_RE = re.compile(rb'\\@input{([^}]+)}')
+
+# PDF viewer command per operating system, resolved once at import
+_SYSTEM = platform.system().lower()
+_PDF_OPENERS = {
+    'darwin': ['open'],  # macOS
+    'windows': ['cmd', '/c', 'start', ''],
+    'linux': ['xdg-open']
+}
+
+# Month name to number mapping
+_MONTH_TO_NUM = {
+    'January': 1, 'Jan': 1,
+    'February': 2, 'Feb': 2,
+    'March': 3, 'Mar': 3,
+    'April': 4, 'Apr': 4,
+    'May': 5,
+    'June': 6, 'Jun': 6,
+    'July': 7, 'Jul': 7,
+    'August': 8, 'Aug': 8,
+    'September': 9, 'Sep': 9,
+    'October': 10, 'Oct': 10,
+    'November': 11, 'Nov': 11,
+    'December': 12, 'Dec': 12
+}
+
+# Invariant LaTeX preamble shared by create_main_file and update_main_file
+_PREAMBLE = r"""\documentclass[a4paper]{book}
+\usepackage{lipsum}
+\usepackage{xcolor}
+\usepackage{framed}
+\usepackage{datetime}
+\usepackage[utf8]{inputenc}
+\usepackage[T1]{fontenc}
+\usepackage{fourier}
+\usepackage{marginnote}
+\usepackage{tikz}
+\usepackage{hyperref}
+\usepackage{graphicx}
+
+\input{input}
+
+\newcommand{\emoamazed}{\includegraphics[height=1.8ex]{"./Emoji/amazed-smiley"}}
+\newcommand{\emobeer}{\includegraphics[height=1.8ex]{"./Emoji/beer-smiley"}}
+\newcommand{\emocoffee}{\includegraphics[height=1.8ex]{"./Emoji/coffee-smiley"}}
+\newcommand{\emoconfused}{\includegraphics[height=1.8ex]{"./Emoji/confused-smiley"}}
+\newcommand{\emoheadbang}{\includegraphics[height=1.8ex]{"./Emoji/headbang-smiley"}}
+\newcommand{\emoshutcalc}{\includegraphics[height=1.8ex]{"./Emoji/shutupandcalc"}}
+\newcommand{\emocode}{\includegraphics[height=1.8ex]{"./Emoji/code-smiley"}}
+\newcommand{\datestampcust}[3]{\dayofweekname{#1}{#2}{#3} {#1.#2.#3}}
+\newcommand{\sep}{-----------------------------------------------------------}
+"""
+
+# Document body appended to _PREAMBLE; only title, author and includes vary
+_BODY_TMPL = r"""
+\title{{\Huge {title}}}
+\author{{{author}}}
+\date{{}}
+
+\begin{{document}}
+\maketitle
+
+{includes}\end{{document}}
+"""
+
+# Map feelings to emojis
+_FEELING_MAP = {
+    'amazing': 'emoamazed',
+    'happy': 'emoamazed',
+    'excited': 'emoamazed',
+    'relaxed': 'emobeer',
+    'chill': 'emobeer',
+    'tired': 'emocoffee',
+    'sleepy': 'emocoffee',
+    'confused': 'emoconfused',
+    'unsure': 'emoconfused',
+    'frustrated': 'emoheadbang',
+    'angry': 'emoheadbang',
+    'focused': 'emoshutcalc',
+    'productive': 'emocode',
+    'coding': 'emocode'
+}
+
+# Map numbers to emojis
+_NUMBER_MAP = {
+    '1': 'emoamazed',  # amazing, happy, excited
+    '2': 'emobeer',    # relaxed, chill
+    '3': 'emocoffee',  # tired, sleepy
+    '4': 'emoconfused',# confused, unsure
+    '5': 'emoheadbang',# frustrated, angry
+    '6': 'emoshutcalc',# focused
+    '7': 'emocode'     # productive, coding
+}
+
+# Keywords tried longest first so the most specific substring match wins
+_FEELING_KEYS_BY_LEN = tuple(sorted(_FEELING_MAP, key=len, reverse=True))
+
 def get_multiline_input(prompt):
     """
     Get multiline input from user until empty line is entered.
@@ -14,34 +120,31 @@ def get_multiline_input(prompt):
         str: Combined multiline input
     """
     print(prompt)
-    lines = []
-    while True:
-        try:
-            line = input()
-            if line == "":
-                break
-            lines.append(line)
-        except EOFError:
+    buf = io.StringIO()
+    # Read through the buffered stdin wrapper until a blank line or EOF
+    for line in iter(sys.stdin.readline, ''):
+        if line == '\n':
             break
-    return "\n".join(lines)
+        buf.write(line)
+    return buf.getvalue().rstrip('\n')
 
 def get_date_input():
     """
     Get and validate date input from user.
-    Returns datetime object for the entry date.
+    Returns date object for the entry date.
     """
     while True:
         is_today = input("Is this entry for today? (y/n): ").strip().lower()
         if is_today in ['y', 'yes']:
-            return datetime.now()
+            return date.today()
         elif is_today in ['n', 'no']:
             while True:
                 try:
                     date_str = input("Enter date (dd/mm/yy): ").strip()
                     # Parse the date string
-                    entry_date = datetime.strptime(date_str, '%d/%m/%y')
+                    entry_date = datetime.strptime(date_str, '%d/%m/%y').date()
                     # Check if date is not in future
-                    if entry_date > datetime.now():
+                    if entry_date > date.today():
                         print("Error: Cannot enter future date")
                         continue
                     return entry_date
@@ -58,7 +161,7 @@ def format_latex_diary(entry_content, mini_page_content, box_content, entry_date
         entry_content (str): Main diary entry text
         mini_page_content (str): Content for first colored box (optional)
         box_content (str): Content for second colored box (optional)
-        entry_date (datetime): Date of the entry
+        entry_date (date): Date of the entry
         emoji (str): Emoji command for the box (default: emoheadbang)
         
     Returns:
@@ -71,9 +174,8 @@ def format_latex_diary(entry_content, mini_page_content, box_content, entry_date
         raise ValueError("Main diary entry cannot be empty")
     
     # Get day name and date components
-    day_name = entry_date.strftime('%A')
-    date_display = entry_date.strftime('%d/%m/%y')
-    month_year = entry_date.strftime('%Y %B')
+    # One strftime call for all three fields
+    day_name, date_display, month_year = entry_date.strftime('%A|%d/%m/%y|%Y %B').split('|')
     
     # Start with the header and main content
     latex_template = f"""% {date_display} - {month_year} Notes
@@ -123,16 +225,16 @@ def extract_date_from_entry(entry):
         entry (str): LaTeX diary entry content
         
     Returns:
-        datetime: Entry date or None if not found
+        date: Entry date or None if not found
     """
+    # Look for date in the format dd/mm/yy
+    date_match = _DIARY_DATE_RE.search(entry)
+    if not date_match:
+        return None
     try:
-        # Look for date in the format dd/mm/yy
-        date_match = re.search(r'\\begin{diary}{[^}]+}{(\d{2}/\d{2}/\d{2})}', entry)
-        if date_match:
-            return datetime.strptime(date_match.group(1), '%d/%m/%y')
-    except:
-        pass
-    return None
+        return datetime.strptime(date_match.group(1), '%d/%m/%y').date()
+    except ValueError:
+        return None
 
 def create_main_file():
     """
@@ -143,40 +245,7 @@ def create_main_file():
     title = input("Enter the title for your diary: ").strip()
     author = input("Enter your name (author): ").strip()
     
-    latex_content = f"""\\documentclass[a4paper]{{book}}
-\\usepackage{{lipsum}}
-\\usepackage{{xcolor}}
-\\usepackage{{framed}}
-\\usepackage{{datetime}}
-\\usepackage[utf8]{{inputenc}}
-\\usepackage[T1]{{fontenc}}
-\\usepackage{{fourier}}
-\\usepackage{{marginnote}}
-\\usepackage{{tikz}}
-\\usepackage{{hyperref}}
-\\usepackage{{graphicx}}
-
-\\input{{input}}
-
-\\newcommand{{\\emoamazed}}{{\\includegraphics[height=1.8ex]{{"./Emoji/amazed-smiley"}}}}
-\\newcommand{{\\emobeer}}{{\\includegraphics[height=1.8ex]{{"./Emoji/beer-smiley"}}}}
-\\newcommand{{\\emocoffee}}{{\\includegraphics[height=1.8ex]{{"./Emoji/coffee-smiley"}}}}
-\\newcommand{{\\emoconfused}}{{\\includegraphics[height=1.8ex]{{"./Emoji/confused-smiley"}}}}
-\\newcommand{{\\emoheadbang}}{{\\includegraphics[height=1.8ex]{{"./Emoji/headbang-smiley"}}}}
-\\newcommand{{\\emoshutcalc}}{{\\includegraphics[height=1.8ex]{{"./Emoji/shutupandcalc"}}}}
-\\newcommand{{\\emocode}}{{\\includegraphics[height=1.8ex]{{"./Emoji/code-smiley"}}}}
-\\newcommand{{\\datestampcust}}[3]{{\\dayofweekname{{#1}}{{#2}}{{#3}} {{#1.#2.#3}}}}
-\\newcommand{{\\sep}}{{-----------------------------------------------------------}}
-
-\\title{{\\Huge {title}}}
-\\author{{{author}}}
-\\date{{}}
-
-\\begin{{document}}
-\\maketitle
-
-\\end{{document}}
-"""
+    latex_content = _PREAMBLE + _BODY_TMPL.format(title=title, author=author, includes='')
     
     try:
         # Create Emoji directory if it doesn't exist
@@ -213,83 +282,40 @@ def update_main_file():
             create_main_file()
             return
             
-        # Read existing title and author if file exists
-        with open('MainFile.tex', 'r', encoding='utf-8') as f:
-            content = f.read()
-            title_match = re.search(r'\\title{\\Huge ([^}]+)}', content)
-            author_match = re.search(r'\\author{([^}]+)}', content)
-            title = title_match.group(1) if title_match else "My Diary"
-            author = author_match.group(1) if author_match else "Anonymous"
-
-        # Month name to number mapping
-        month_to_num = {
-            'January': 1, 'Jan': 1,
-            'February': 2, 'Feb': 2,
-            'March': 3, 'Mar': 3,
-            'April': 4, 'Apr': 4,
-            'May': 5,
-            'June': 6, 'Jun': 6,
-            'July': 7, 'Jul': 7,
-            'August': 8, 'Aug': 8,
-            'September': 9, 'Sep': 9,
-            'October': 10, 'Oct': 10,
-            'November': 11, 'Nov': 11,
-            'December': 12, 'Dec': 12
-        }
-        
         # Get all year folders
-        years = [d for d in os.listdir('.') if os.path.isdir(d) and d.isdigit()]
-        years.sort()  # Sort years numerically
+        with os.scandir('.') as it:
+            years = sorted(e.name for e in it if e.is_dir(follow_symlinks=False) and e.name.isdigit())
         
         includes = []
         
         # For each year, get all month files
         for year in years:
-            month_files = [f for f in os.listdir(year) if f.endswith('_' + year + '.tex')]
-            # Sort month files by month number
-            month_files.sort(key=lambda x: month_to_num[x.split('_')[0]])
+            with os.scandir(year) as it:
+                month_files = [e.name for e in it if e.name.endswith(f'_{year}.tex')]
+            # Sort month files by month number, computing each key once
+            decorated = [(_MONTH_TO_NUM[f.split('_', 1)[0]], f) for f in month_files]
+            decorated.sort()
+            month_files = [f for _, f in decorated]
             
             # Add include statements for each month file
             for month_file in month_files:
                 includes.append(f"\\include{{{'./' + year + '/' + month_file.replace('.tex', '')}}}")
+        include_block = '\n'.join(includes) + '\n\n'
+        
+        # Read existing title and author; MainFile.tex stays the source of truth
+        with open('MainFile.tex', 'r', encoding='utf-8') as f:
+            content = f.read()
+            title_match = _TITLE_RE.search(content)
+            author_match = _AUTHOR_RE.search(content)
+            title = title_match.group(1) if title_match else "My Diary"
+            author = author_match.group(1) if author_match else "Anonymous"
         
         # Create complete LaTeX document
-        latex_content = f"""\\documentclass[a4paper]{{book}}
-\\usepackage{{lipsum}}
-\\usepackage{{xcolor}}
-\\usepackage{{framed}}
-\\usepackage{{datetime}}
-\\usepackage[utf8]{{inputenc}}
-\\usepackage[T1]{{fontenc}}
-\\usepackage{{fourier}}
-\\usepackage{{marginnote}}
-\\usepackage{{tikz}}
-\\usepackage{{hyperref}}
-\\usepackage{{graphicx}}
-
-\\input{{input}}
-
-\\newcommand{{\\emoamazed}}{{\\includegraphics[height=1.8ex]{{"./Emoji/amazed-smiley"}}}}
-\\newcommand{{\\emobeer}}{{\\includegraphics[height=1.8ex]{{"./Emoji/beer-smiley"}}}}
-\\newcommand{{\\emocoffee}}{{\\includegraphics[height=1.8ex]{{"./Emoji/coffee-smiley"}}}}
-\\newcommand{{\\emoconfused}}{{\\includegraphics[height=1.8ex]{{"./Emoji/confused-smiley"}}}}
-\\newcommand{{\\emoheadbang}}{{\\includegraphics[height=1.8ex]{{"./Emoji/headbang-smiley"}}}}
-\\newcommand{{\\emoshutcalc}}{{\\includegraphics[height=1.8ex]{{"./Emoji/shutupandcalc"}}}}
-\\newcommand{{\\emocode}}{{\\includegraphics[height=1.8ex]{{"./Emoji/code-smiley"}}}}
-\\newcommand{{\\datestampcust}}[3]{{\\dayofweekname{{#1}}{{#2}}{{#3}} {{#1.#2.#3}}}}
-\\newcommand{{\\sep}}{{-----------------------------------------------------------}}
-
-\\title{{\\Huge {title}}}
-\\author{{{author}}}
-\\date{{}}
-
-\\begin{{document}}
-\\maketitle
-
-{chr(10).join(includes)}
-
-\\end{{document}}
-"""
+        latex_content = _PREAMBLE + _BODY_TMPL.format(title=title, author=author, includes=include_block)
+        
+        # Skip the write if the generated document is unchanged
+        if latex_content == content:
+            return
         
         # Write to MainFile.tex
         with open('MainFile.tex', 'w', encoding='utf-8') as f:
@@ -298,27 +324,70 @@ def update_main_file():
     except Exception as e:
         print(f"Error updating MainFile.tex: {e}", file=sys.stderr)
 
+def _aux_hash():
+    """
+    Hash the LaTeX auxiliary files so compile_latex can tell whether a rerun is needed.
+    Covers MainFile.aux, every month .aux it pulls in via \\@input, and the
+    hyperref bookmarks in MainFile.out, since page counters and margin note
+    positions live in the month files.
+    
+    Returns:
+        bytes: MD5 digest of the auxiliary files, or b'' if none exist
+    """
+    if not os.path.exists('MainFile.aux'):
+        return b''
+    digest = hashlib.md5()
+    with open('MainFile.aux', 'rb') as f:
+        main_aux = f.read()
+    digest.update(main_aux)
+    paths = [m.decode('utf-8') for m in _AUX_INPUT_RE.findall(main_aux)]
+    for path in paths + ['MainFile.out']:
+        # Include the name so a file appearing or vanishing changes the hash
+        digest.update(path.encode('utf-8'))
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.digest()
+
 def compile_latex():
     """
     Compile MainFile.tex using pdflatex.
-    Runs pdflatex twice to ensure proper cross-references and table of contents.
+    Runs a second pass only if the first one changed the auxiliary files,
+    i.e. when cross-references, margin notes or bookmarks moved.
     """
+    command = ['pdflatex', '-interaction=batchmode', '-halt-on-error', 'MainFile.tex']
     try:
-        # Run pdflatex twice to ensure proper cross-references
-        os.system('pdflatex MainFile.tex')
-        os.system('pdflatex MainFile.tex')
+        aux_before = _aux_hash()
+        result = subprocess.run(command, check=False, stdout=subprocess.DEVNULL)
+        if result.returncode == 0 and _aux_hash() != aux_before:
+            result = subprocess.run(command, check=False, stdout=subprocess.DEVNULL)
+        if result.returncode != 0:
+            print("Error during LaTeX compilation, see MainFile.log for details", file=sys.stderr)
+            return
         print("\nLaTeX compilation completed successfully.")
     except Exception as e:
         print(f"Error during LaTeX compilation: {e}", file=sys.stderr)
 
+@functools.lru_cache(maxsize=366)
+def _year_month(ordinal):
+    """
+    Year and full month name for a date, cached by its ordinal.
+    
+    Args:
+        ordinal (int): Proleptic Gregorian ordinal of the date
+        
+    Returns:
+        tuple: (year, month) strings, e.g. ('2025', 'March')
+    """
+    return tuple(date.fromordinal(ordinal).strftime('%Y|%B').split('|'))
+
 def save_latex_file(content, entry_date):
     """
     Save LaTeX content to a file in date-based folder structure.
     Format: YYYY/Month_YYYY.tex (e.g., 2025/March_2025.tex)
     Creates separate entries for the same date.
     """
-    year = entry_date.strftime('%Y')
-    month = entry_date.strftime('%B')  # Full month name
+    year, month = _year_month(entry_date.toordinal())
     file_name = f"{month}_{year}.tex"
     
     try:
@@ -326,33 +395,44 @@ def save_latex_file(content, entry_date):
         os.makedirs(year, exist_ok=True)
         file_path = os.path.join(year, file_name)
         
+        # Each entry is stored as (date, text) so dates are parsed only once
         entries = []
+        seen = set()
+        existing_content = ''
         
         # If file exists, read existing entries
         if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
             with open(file_path, 'r', encoding='utf-8') as f:
                 existing_content = f.read()
-                # Split on \end{diary} to ensure complete entries
-                raw_entries = existing_content.split('\\end{diary}')
-                for entry in raw_entries:
-                    entry = entry.strip()
-                    if entry and '\\begin{diary}' in entry:
-                        # Add back the closing tag for each valid entry
-                        entries.append(f"{entry}\n\\end{{diary}}")
+            # Split on \end{diary} and add the closing tag back to each valid entry
+            texts = [
+                f"{e}\n\\end{{diary}}"
+                for e in (part.strip() for part in existing_content.split('\\end{diary}'))
+                if e and '\\begin{diary}' in e
+            ]
+            entries = [(extract_date_from_entry(text) or date.max, text) for text in texts]
+            seen = set(texts)
         
-        # Add the new content only if it's not already in entries
-        if content.strip() not in [e.strip() for e in entries]:
-            entries.append(content.strip())
+        # Only append to files that are already sorted; anything else is repaired by a rewrite
+        in_order = all(a[0] <= b[0] for a, b in zip(entries, entries[1:]))
         
-        # Sort entries by date in ascending order
-        entries.sort(key=lambda x: extract_date_from_entry(x) or datetime.max, reverse=False)
-        
-        # Write all entries back to file with proper spacing
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for i, entry in enumerate(entries):
-                if i > 0:  # Add double newline between entries
-                    f.write('\n\n')
-                f.write(entry.strip())
+        new_entry = content.strip()
+        if entries and in_order and new_entry not in seen and entry_date >= entries[-1][0]:
+            # New entry is the latest one, so append instead of rewriting the file
+            separator = '\n' if existing_content.endswith('\n') else '\n\n'
+            with open(file_path, 'a', encoding='utf-8') as f:
+                f.write(separator + new_entry + '\n')
+        else:
+            # Add the new content only if it's not already in entries
+            if new_entry not in seen:
+                entries.append((entry_date, new_entry))
+            
+            # Sort entries by date in ascending order
+            entries.sort(key=operator.itemgetter(0))
+            
+            # Write all entries back to file with proper spacing
+            with open(file_path, 'w', encoding='utf-8', buffering=1 << 17) as f:
+                f.write('\n\n'.join(text for _, text in entries) + '\n')
         
         # Update MainFile.tex after adding new entry
         update_main_file()
@@ -372,46 +452,19 @@ def get_emoji_for_feeling(feeling):
     Returns:
         str: LaTeX emoji command
     """
-    # Map feelings to emojis
-    feeling_map = {
-        'amazing': 'emoamazed',
-        'happy': 'emoamazed',
-        'excited': 'emoamazed',
-        'relaxed': 'emobeer',
-        'chill': 'emobeer',
-        'tired': 'emocoffee',
-        'sleepy': 'emocoffee',
-        'confused': 'emoconfused',
-        'unsure': 'emoconfused',
-        'frustrated': 'emoheadbang',
-        'angry': 'emoheadbang',
-        'focused': 'emoshutcalc',
-        'productive': 'emocode',
-        'coding': 'emocode'
-    }
-    
-    # Map numbers to emojis
-    number_map = {
-        '1': 'emoamazed',  # amazing, happy, excited
-        '2': 'emobeer',    # relaxed, chill
-        '3': 'emocoffee',  # tired, sleepy
-        '4': 'emoconfused',# confused, unsure
-        '5': 'emoheadbang',# frustrated, angry
-        '6': 'emoshutcalc',# focused
-        '7': 'emocode'     # productive, coding
-    }
-    
     # Check if input is a number
-    if feeling in number_map:
-        return number_map[feeling]
+    if feeling in _NUMBER_MAP:
+        return _NUMBER_MAP[feeling]
     
     # Convert to lowercase for case-insensitive matching
     feeling = feeling.lower()
     
-    # Find matching emoji
-    for key in feeling_map:
+    # Exact keyword first, then fall back to a substring match
+    if feeling in _FEELING_MAP:
+        return _FEELING_MAP[feeling]
+    for key in _FEELING_KEYS_BY_LEN:
         if key in feeling:
-            return feeling_map[key]
+            return _FEELING_MAP[key]
     return 'emoheadbang'
 
 def print_mood_options():
@@ -438,15 +491,9 @@ def open_pdf():
     Uses appropriate command based on the operating system.
     """
     try:
-        import platform
-        system = platform.system().lower()
-        
-        if system == 'darwin':  # macOS
-            os.system('open MainFile.pdf')
-        elif system == 'windows':
-            os.system('start MainFile.pdf')
-        elif system == 'linux':
-            os.system('xdg-open MainFile.pdf')
+        command = _PDF_OPENERS.get(_SYSTEM)
+        if command:
+            subprocess.Popen(command + ['MainFile.pdf'])
         else:
             print("Could not automatically open PDF. Please open MainFile.pdf manually.")
             
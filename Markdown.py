@@ -1,8 +1,30 @@
-from datetime import datetime
+from datetime import date, datetime
+import mmap
 import os
 import sys
 import re
 
+# Header, mood and main text of one entry, matched in a single pass
+_ENTRY_RE = re.compile(
+    r'\\begin\{diary\}\{(?P<day>[^}]+)\}\{(?P<date>\d{2}/\d{2}/\d{2})\}\s*'
+    r'(?:\\mybox\{\\(?P<emoji>emo[^}]+)\}\s*)?'
+    r'(?P<content>.*?)(?=\\noindent\\fcolorbox|\\end\{diary\}|\Z)',
+    re.DOTALL
+)
+_BOX_RE = re.compile(r'\\minipage[^{]*{[^}]+}(.*?)\\endminipage', re.DOTALL)
+
+# LaTeX emoji command to terminal emoji
+_EMOJI_UNICODE = {
+    'emoamazed': '😄',
+    'emobeer': '🍺',
+    'emocoffee': '☕',
+    'emoconfused': '😕',
+    'emoheadbang': '😠',
+    'emoshutcalc': '🧮',
+    'emocode': '💻'
+}
+_DEFAULT_EMOJI = '😠'
+
 def search_entries_by_date(search_date=None):
     """
     Search and display diary entries by date.
@@ -16,7 +38,7 @@ def search_entries_by_date(search_date=None):
             while True:
                 date_input = input("Enter date to search (dd/mm/yy) or 'today': ").strip().lower()
                 if date_input == 'today':
-                    search_date = datetime.now().strftime('%d/%m/%y')
+                    search_date = date.today().strftime('%d/%m/%y')
                     break
                 try:
                     # Validate date format
@@ -37,74 +59,74 @@ def search_entries_by_date(search_date=None):
         
         # Search through all month files in the year
         month_files = [f for f in os.listdir(year) if f.endswith('.tex')]
+        date_bytes = search_date.encode()
         for month_file in month_files:
             file_path = os.path.join(year, month_file)
             
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    # Split into individual entries
-                    entries = [entry.strip() for entry in content.split('\n\n') if entry.strip()]
-                    
-                    for entry in entries:
-                        date_match = re.search(r'\\begin{diary}{([^}]+)}{(\d{2}/\d{2}/\d{2})}', entry)
-                        if date_match and date_match.group(2) == search_date:
-                            # Extract emoji
-                            emoji_match = re.search(r'\\mybox{\\(emo[^}]+)}', entry)
-                            emoji = {
-                                'emoamazed': '😄',
-                                'emobeer': '🍺',
-                                'emocoffee': '☕',
-                                'emoconfused': '😕',
-                                'emoheadbang': '😠',
-                                'emoshutcalc': '🧮',
-                                'emocode': '💻'
-                            }.get(emoji_match.group(1) if emoji_match else 'emoheadbang', '😠')
-                            
-                            # Extract content
-                            content_match = re.search(r'\\mybox{[^}]+}\s*(.*?)(?:\\noindent\\fcolorbox|\\end{diary})', entry, re.DOTALL)
-                            main_content = content_match.group(1).strip() if content_match else ""
-                            
-                            # Extract box contents
-                            box_pattern = r'\\minipage[^{]*{[^}]+}(.*?)\\endminipage'
-                            boxes = re.findall(box_pattern, entry, re.DOTALL)
-                            
-                            found_entries.append({
-                                'day': date_match.group(1),
-                                'content': main_content,
-                                'emoji': emoji,
-                                'boxes': boxes
-                            })
-                            
+                with open(file_path, 'rb') as f:
+                    # mmap cannot map an empty file
+                    if os.fstat(f.fileno()).st_size == 0:
+                        continue
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        # Skip months that cannot contain the date before decoding
+                        if mm.find(date_bytes) < 0:
+                            continue
+                        content = mm[:].decode('utf-8')
+                
+                # Split on \end{diary} so entries containing blank lines stay whole
+                for entry in content.split('\\end{diary}'):
+                    # Cheap substring check before running the regex
+                    if search_date not in entry:
+                        continue
+                    entry_match = _ENTRY_RE.search(entry)
+                    if entry_match and entry_match.group('date') == search_date:
+                        # Extract emoji
+                        emoji = _EMOJI_UNICODE.get(entry_match.group('emoji') or 'emoheadbang', _DEFAULT_EMOJI)
+                        
+                        # Extract box contents
+                        boxes = _BOX_RE.findall(entry)
+                        
+                        found_entries.append({
+                            'day': entry_match.group('day'),
+                            'content': entry_match.group('content').strip(),
+                            'emoji': emoji,
+                            'boxes': boxes
+                        })
+                        
             except Exception as e:
                 print(f"Error reading {file_path}: {e}")
         
         if found_entries:
-            print(f"\nEntries for {search_date}:")
-            print("=" * 60)
+            # Collect output and emit it with a single write
+            out = []
+            out.append(f"\nEntries for {search_date}:")
+            out.append("=" * 60)
             
             for i, entry in enumerate(found_entries, 1):
                 if len(found_entries) > 1:
-                    print(f"\nEntry #{i}")
-                    print("-" * 60)
+                    out.append(f"\nEntry #{i}")
+                    out.append("-" * 60)
                 
-                print(f"Date: {search_date}")
-                print(f"Day: {entry['day']}")
-                print(f"Mood: {entry['emoji']}")
-                print("\nContent:")
-                print("-" * 60)
-                print(entry['content'].strip())
+                out.append(f"Date: {search_date}")
+                out.append(f"Day: {entry['day']}")
+                out.append(f"Mood: {entry['emoji']}")
+                out.append("\nContent:")
+                out.append("-" * 60)
+                out.append(entry['content'].strip())
                 
                 if entry['boxes']:
-                    print("\nAdditional Notes:")
-                    print("-" * 60)
+                    out.append("\nAdditional Notes:")
+                    out.append("-" * 60)
                     for j, box in enumerate(entry['boxes'], 1):
-                        print(f"Note {j}:")
-                        print(box.strip())
+                        out.append(f"Note {j}:")
+                        out.append(box.strip())
                         if j < len(entry['boxes']):
-                            print("-" * 30)
+                            out.append("-" * 30)
                 
-                print("=" * 60)
+                out.append("=" * 60)
+            
+            sys.stdout.write('\n'.join(out) + '\n')
         else:
             print(f"\nNo entries found for {search_date}")
             